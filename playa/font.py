@@ -836,6 +836,9 @@ class Font:
             list_value(resolve_all(descriptor.get("FontBBox", (0, 0, 0, 0)))),
         )
         self.hscale = self.vscale = 0.001
+        # Glyph widths, memoized by CID (the same few glyphs get used
+        # over and over again in text objects)
+        self._widths_cache: Dict[int, float] = {}
 
         # PDF RM 9.8.1 specifies /Descent should always be a negative number.
         # PScript5.dll seems to produce Descent with a positive number, but
@@ -922,13 +925,30 @@ class SimpleFont(Font):
             log.debug("ToUnicode: %r", vars(self.tounicode))
         Font.__init__(self, descriptor, widths)
 
+    _unicode_table: Union[Tuple[str, ...], None] = None
+
+    def unicode_table(self) -> Tuple[str, ...]:
+        """Get the Unicode mapping for all 256 possible codes."""
+        # This is done lazily since subclasses may change the encoding
+        # after initialization
+        if self._unicode_table is None:
+            if self.tounicode is not None:
+                # Code space is always single-byte for simple fonts (see
+                # above) and undefined codes map to themselves
+                b2u = self.tounicode.bytes2unicode
+                self._unicode_table = tuple(
+                    b2u.get(bytes((code,)), chr(code)) for code in range(256)
+                )
+            else:
+                self._unicode_table = tuple(
+                    self.cid2unicode.get(code, "") for code in range(256)
+                )
+        return self._unicode_table
+
     def decode(self, data: bytes) -> Iterable[Tuple[int, str]]:
-        if self.tounicode is not None:
-            log.debug("decode with ToUnicodeMap: %r", data)
-            return zip(data, self.tounicode.decode(data))
-        else:
-            log.debug("decode with BaseEncoding: %r", data)
-            return ((cid, self.cid2unicode.get(cid, "")) for cid in data)
+        # Codes and CIDs are the same single bytes in simple fonts,
+        # so this can just be a table lookup
+        return zip(data, map(self.unicode_table().__getitem__, data))
 
 
 class Type1Font(SimpleFont):
@@ -2,9 +2,11 @@
 Classes for looking at pages and their contents.
 """
 
+import functools
 import itertools
 import logging
-import re
+import sys
+import weakref
 from copy import copy
 from dataclasses import dataclass
 from typing import (
@@ -36,7 +38,14 @@ from playa.exceptions import (
 from playa.font import Font
 
 # FIXME: PDFObject needs to go in pdftypes somehow
-from playa.parser import KWD, InlineImage, ObjectParser, PDFObject, Token
+from playa.parser import (
+    KWD,
+    TOKEN_CACHE_SIZE,
+    InlineImage,
+    ObjectParser,
+    PDFObject,
+    Token,
+)
 from playa.pdftypes import (
     LIT,
     ContentStream,
@@ -78,13 +87,24 @@ LITERAL_FORM = LIT("Form")
 LITERAL_IMAGE = LIT("Image")
 TextSeq = Iterable[Union[int, float, bytes]]
 DeviceSpace = Literal["page", "screen", "default", "user"]
+# Colour spaces implicitly set by the G, g, RG, rg, K and k operators
+DEVICE_GRAY = PREDEFINED_COLORSPACE["DeviceGray"]
+DEVICE_RGB = PREDEFINED_COLORSPACE["DeviceRGB"]
+DEVICE_CMYK = PREDEFINED_COLORSPACE["DeviceCMYK"]
+# Use __slots__ for mutable state objects where possible (Python 3.10+)
+if TYPE_CHECKING:
+    from dataclasses import dataclass as slotted_dataclass
+elif sys.version_info >= (3, 10):
+    slotted_dataclass = dataclass(slots=True)
+else:
+    slotted_dataclass = dataclass
 
 
 # FIXME: This should go in utils/pdftypes but there are circular imports
 def parse_rect(o: PDFObject) -> Rect:
     try:
-        (x0, y0, x1, y1) = (num_value(x) for x in list_value(o))
-        return x0, y0, x1, y1
+        (x0, y0, x1, y1) = list_value(o)
+        return num_value(x0), num_value(y0), num_value(x1), num_value(y1)
     except ValueError:
         raise ValueError("Could not parse rectangle %r" % (o,))
     except TypeError:
@@ -290,7 +310,7 @@ class Page:
         return f"<Page: Resources={self.resources!r}, MediaBox={self.mediabox!r}>"
 
 
-@dataclass
+@slotted_dataclass
 class TextState:
     """PDF Text State (PDF 1.7 section 9.3.1).
 
@@ -314,8 +334,8 @@ class TextState:
         This is often just 1.0 as it relies on the text matrix (you
         may use `line_matrix` here) to scale it to the actual size in
         user space.
-      charspace: Extra spacing to add between each glyph, in
-        text space units.
+      charspace: Extra spacing to add after each glyph (including
+        the last one in a string), in text space units.
       wordspace: The width of a space, defined curiously as `cid==32`
         (But PDF Is A prESeNTaTion fORmAT sO ThERe maY NOt Be aNY
         SpACeS!!), in text space units.
@@ -349,6 +369,22 @@ class TextState:
         self.line_matrix = MATRIX_IDENTITY
         self.glyph_offset = (0, 0)
 
+    def copy(self) -> "TextState":
+        """Make a shallow copy (much faster than `copy.copy`)."""
+        return TextState(
+            line_matrix=self.line_matrix,
+            glyph_offset=self.glyph_offset,
+            font=self.font,
+            fontsize=self.fontsize,
+            charspace=self.charspace,
+            wordspace=self.wordspace,
+            scaling=self.scaling,
+            leading=self.leading,
+            render_mode=self.render_mode,
+            rise=self.rise,
+            descent=self.descent,
+        )
+
 
 class DashPattern(NamedTuple):
     """
@@ -369,7 +405,7 @@ class DashPattern(NamedTuple):
             return f"{self.dash} {self.phase}"
 
 
-@dataclass
+@slotted_dataclass
 class GraphicState:
     """PDF Graphics state (PDF 1.7 section 8.4)
 
@@ -398,11 +434,27 @@ class GraphicState:
     # stroking color
     scolor: Color = BASIC_BLACK
     # stroking color space
-    scs: ColorSpace = PREDEFINED_COLORSPACE["DeviceGray"]
+    scs: ColorSpace = DEVICE_GRAY
     # non stroking color
     ncolor: Color = BASIC_BLACK
     # non stroking color space
-    ncs: ColorSpace = PREDEFINED_COLORSPACE["DeviceGray"]
+    ncs: ColorSpace = DEVICE_GRAY
+
+    def copy(self) -> "GraphicState":
+        """Make a shallow copy (much faster than `copy.copy`)."""
+        return GraphicState(
+            linewidth=self.linewidth,
+            linecap=self.linecap,
+            linejoin=self.linejoin,
+            miterlimit=self.miterlimit,
+            dash=self.dash,
+            intent=self.intent,
+            flatness=self.flatness,
+            scolor=self.scolor,
+            scs=self.scs,
+            ncolor=self.ncolor,
+            ncs=self.ncs,
+        )
 
 
 class ContentParser(ObjectParser):
@@ -419,27 +471,27 @@ class ContentParser(ObjectParser):
     """
 
     def __init__(self, streams: Iterable[PDFObject]) -> None:
-        self.streamiter = iter(streams)
-        try:
-            stream = stream_value(next(self.streamiter))
-            super().__init__(stream.buffer)
-        except StopIteration:
-            super().__init__(b"")
+        # Simply concatenate them (separated by whitespace, to be sure
+        # that tokens do not run together) so that the lexer does not
+        # have to switch streams.  Note that joining a single stream
+        # does not copy it.
+        super().__init__(b"\n".join(stream_value(s).buffer for s in streams))
+
+
+# Parsed contents of form XObjects, which are often reused many times
+# (on every page, for instance) and thus worth keeping around for as
+# long as the stream itself exists.
+_form_contents: "weakref.WeakKeyDictionary[ContentStream, List[PDFObject]]" = (
+    weakref.WeakKeyDictionary()
+)
 
-    def nexttoken(self) -> Tuple[int, Token]:
-        """Override nexttoken() to continue parsing in subsequent streams.
 
-        TODO: If we want to avoid evil implementation inheritance, we
-        should do this in the lexer instead.
-        """
-        while True:
-            try:
-                return super().nexttoken()
-            except StopIteration:
-                # Will also raise StopIteration if there are no more,
-                # which is exactly what we want
-                stream = stream_value(next(self.streamiter))
-                self.newstream(stream.buffer)
+def form_contents(stream: ContentStream) -> List[PDFObject]:
+    """Get the (cached) operands and operators of a form XObject."""
+    objs = _form_contents.get(stream)
+    if objs is None:
+        objs = _form_contents[stream] = [obj for _, obj in ContentParser([stream])]
+    return objs
 
 
 class MarkedContent(NamedTuple):
@@ -469,7 +521,7 @@ class PathSegment(NamedTuple):
     points: Tuple[Point, ...]
 
 
-@dataclass
+@slotted_dataclass
 class ContentObject:
     """Any sort of content object.
 
@@ -524,7 +576,7 @@ class ContentObject:
 BBOX_NONE = (-1, -1, -1, -1)
 
 
-@dataclass
+@slotted_dataclass
 class TagObject(ContentObject):
     """A marked content tag.."""
 
@@ -545,7 +597,8 @@ class TagObject(ContentObject):
         content section with an ID."""
         if self._mcs.mcid is not None:
             return self._mcs.mcid
-        return super().mcid
+        # Not super(), which does not work with slotted dataclasses
+        return ContentObject.mcid.fget(self)  # type: ignore[attr-defined]
 
     @property
     def bbox(self) -> Rect:
@@ -562,7 +615,7 @@ class TagObject(ContentObject):
         return BBOX_NONE
 
 
-@dataclass
+@slotted_dataclass
 class ImageObject(ContentObject):
     """An image (either inline or XObject).
 
@@ -608,7 +661,7 @@ class ImageObject(ContentObject):
         return get_transformed_bound(self.ctm, (0, 0, 1, 1))
 
 
-@dataclass
+@slotted_dataclass
 class XObjectObject(ContentObject):
     """An eXternal Object, in the context of a page.
 
@@ -672,10 +725,11 @@ class XObjectObject(ContentObject):
             yield obj
 
     def __iter__(self) -> Iterator["ContentObject"]:
-        return iter(LazyInterpreter(self.page, [self.stream], self.resources))
+        interp = LazyInterpreter(self.page, [self.stream], self.resources)
+        return interp.interpret(form_contents(self.stream))
 
 
-@dataclass
+@slotted_dataclass
 class PathObject(ContentObject):
     """A path object.
 
@@ -740,10 +794,16 @@ class PathObject(ContentObject):
     @property
     def segments(self) -> Iterator[PathSegment]:
         """Get path segments in device space."""
+        # No transformation at all (possible in "default" space)
+        if self.ctm is MATRIX_IDENTITY:
+            return iter(self.raw_segments)
+        # Equivalent to apply_matrix_pt on each point, but unpacking
+        # the matrix only once
+        (a, b, c, d, e, f) = self.ctm
         return (
             PathSegment(
                 p.operator,
-                tuple(apply_matrix_pt(self.ctm, point) for point in p.points),
+                tuple((a * x + c * y + e, b * x + d * y + f) for x, y in p.points),
             )
             for p in self.raw_segments
         )
@@ -760,7 +820,7 @@ class PathObject(ContentObject):
         return get_transformed_bound(self.ctm, bbox)
 
 
-@dataclass
+@slotted_dataclass
 class GlyphObject(ContentObject):
     """Individual glyph on the page.
 
@@ -824,14 +884,10 @@ class GlyphObject(ContentObject):
         else:
             x0, y0 = apply_matrix_pt(self.matrix, (x0, y0))
             x1, y1 = apply_matrix_pt(self.matrix, (x1, y1))
-            if x1 < x0:
-                x0, x1 = x1, x0
-            if y1 < y0:
-                y0, y1 = y1, y0
-            return (x0, y0, x1, y1)
+            return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
 
 
-@dataclass
+@slotted_dataclass
 class TextObject(ContentObject):
     """Text object (contains one or more glyphs).
 
@@ -859,9 +915,10 @@ class TextObject(ContentObject):
                 self.args,
             )
             return
-        assert self.ctm is not None
+        gstate, ctm, mcstack = self.gstate, self.ctm, self.mcstack
+        assert ctm is not None
         # Extract all the elements so we can translate efficiently
-        a, b, c, d, e, f = mult_matrix(tstate.line_matrix, self.ctm)
+        a, b, c, d, e, f = mult_matrix(tstate.line_matrix, ctm)
         # Pre-determine if we need to recompute the bound for rotated glyphs
         corners = b * d < 0 or a * c < 0
         # Apply horizontal scaling
@@ -871,39 +928,52 @@ class TextObject(ContentObject):
         vert = font.vertical
         if font.multibyte:
             wordspace = 0
+        fontsize = tstate.fontsize
+        wscale = fontsize * scaling
+        dxscale = 0.001 * wscale
+        widths = font._widths_cache
         (x, y) = tstate.glyph_offset
-        pos = y if vert else x
-        needcharspace = False
+        # Only one coordinate changes, so translate by the other one
+        # once here, then each glyph is just offset along the line
+        if vert:
+            pos = y
+            dx, dy = c, d
+            e += x * a
+            f += x * b
+        else:
+            pos = x
+            dx, dy = a, b
+            e += y * c
+            f += y * d
         for obj in self.args:
             if isinstance(obj, (int, float)):
-                dxscale = 0.001 * tstate.fontsize * scaling
                 pos -= obj * dxscale
-                needcharspace = True
             else:
                 for cid, text in font.decode(obj):
-                    if needcharspace:
-                        pos += charspace
                     tstate.glyph_offset = (x, pos) if vert else (pos, y)
-                    textwidth = font.char_width(cid)
-                    adv = textwidth * tstate.fontsize * scaling
-                    x, y = tstate.glyph_offset
+                    textwidth = widths.get(cid)
+                    if textwidth is None:
+                        textwidth = widths[cid] = font.char_width(cid)
+                    adv = textwidth * wscale
                     glyph = GlyphObject(
-                        gstate=self.gstate,
-                        ctm=self.ctm,
-                        mcstack=self.mcstack,
+                        gstate=gstate,
+                        ctm=ctm,
+                        mcstack=mcstack,
                         textstate=tstate,
                         cid=cid,
                         text=text,
                         # Do pre-translation internally (taking rotation into account)
-                        matrix=(a, b, c, d, x * a + y * c + e, x * b + y * d + f),
+                        matrix=(a, b, c, d, pos * dx + e, pos * dy + f),
                         adv=adv,
                         corners=corners,
                     )
                     yield glyph
-                    pos += adv
-                    if cid == 32 and wordspace:
+                    # Character spacing follows every glyph (PDF 1.7
+                    # section 9.4.4)
+                    pos += adv + charspace
+                    # Word spacing is zero (or disabled) most of the time
+                    if wordspace and cid == 32:
                         pos += wordspace
-                    needcharspace = True
         tstate.glyph_offset = (x, pos) if vert else (pos, y)
 
     @property
@@ -942,10 +1012,52 @@ def make_seg(operator: PathOperator, *points: Point):
     return PathSegment(operator, points)
 
 
+# Path segments are immutable, so there is no need to make a new one
+# every time a subpath is closed
+PATH_CLOSE = PathSegment("h", ())
+
+
 def point_value(x: PDFObject, y: PDFObject) -> Point:
     return (num_value(x), num_value(y))
 
 
+# There are only a few distinct marked content tags, and they repeat
+# themselves a lot, so caching them makes sense (but not without limit,
+# since a hostile document could create any number of them)
+@functools.lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tag_name(name: str) -> str:
+    return decode_text(name)
+
+
+OperatorTable = Dict[PSKeyword, Tuple[Callable, int]]
+_operator_tables: Dict[type, OperatorTable] = {}
+
+
+def operator_table(cls: type) -> OperatorTable:
+    """Map PDF operators to the (unbound) methods of an interpreter
+    class which implement them, along with their number of arguments.
+
+    This is only done once per class since looking through all of the
+    methods is not particularly fast.
+    """
+    if cls in _operator_tables:
+        return _operator_tables[cls]
+    table: OperatorTable = {}
+    for name in dir(cls):
+        if name.startswith("do_"):
+            func = getattr(cls, name)
+            name = name[3:].replace("_a", "*")
+            if name == "_q":
+                name = "'"
+            if name == "_w":
+                name = '"'
+            kwd = KWD(name.encode("iso-8859-1"))
+            nargs = func.__code__.co_argcount - 1
+            table[kwd] = (func, nargs)
+    _operator_tables[cls] = table
+    return table
+
+
 class LazyInterpreter:
     """Interpret the page yielding lazy objects."""
 
@@ -957,18 +1069,7 @@ class LazyInterpreter:
         contents: Iterable[PDFObject],
         resources: Union[Dict, None] = None,
     ) -> None:
-        self._dispatch: Dict[PSKeyword, Tuple[Callable, int]] = {}
-        for name in dir(self):
-            if name.startswith("do_"):
-                func = getattr(self, name)
-                name = re.sub(r"_a", "*", name[3:])
-                if name == "_q":
-                    name = "'"
-                if name == "_w":
-                    name = '"'
-                kwd = KWD(name.encode("iso-8859-1"))
-                nargs = func.__code__.co_argcount - 1
-                self._dispatch[kwd] = (func, nargs)
+        self._dispatch = operator_table(type(self))
         self.page = page
         self.contents = contents
         self.init_resources(page, page.resources if resources is None else resources)
@@ -977,8 +1078,11 @@ class LazyInterpreter:
     def init_resources(self, page: Page, resources: Dict) -> None:
         """Prepare the fonts and XObjects listed in the Resource attribute."""
         self.resources = resources
-        self.fontmap: Dict[object, Font] = {}
-        self.xobjmap = {}
+        self.fontmap: Dict[str, Font] = {}
+        self.fontlits: Dict[PSLiteral, Font] = {}
+        self.xobjmap: Dict[str, PDFObject] = {}
+        # Resolved XObject streams
+        self.xobjcache: Dict[PSLiteral, ContentStream] = {}
         self.csmap: Dict[str, ColorSpace] = copy(PREDEFINED_COLORSPACE)
         if not self.resources:
             return
@@ -998,6 +1102,10 @@ class LazyInterpreter:
                             "Broken/missing font spec for Font ID %r: %r", fontid, spec
                         )
                         self.fontmap[fontid] = doc.get_font(objid, {})
+                # Literals are interned, so Tf can look fonts up by identity
+                self.fontlits = {
+                    LIT(fontid): font for fontid, font in self.fontmap.items()
+                }
             elif k == "ColorSpace":
                 for csid, spec in dict_value(v).items():
                     colorspace = get_colorspace(resolve1(spec), csid)
@@ -1017,6 +1125,7 @@ class LazyInterpreter:
         self.ctm = ctm
         self.textstate = TextState()
         self.graphicstate = GraphicState()
+        self.gstate_shared = False
         self.curpath: List[PathSegment] = []
         # argstack: stack for command arguments.
         self.argstack: List[PDFObject] = []
@@ -1030,49 +1139,72 @@ class LazyInterpreter:
         if n == 0:
             return []
         x = self.argstack[-n:]
-        self.argstack = self.argstack[:-n]
+        # Truncate in place rather than copying the rest of the stack
+        del self.argstack[-n:]
         return x
 
     def get_current_state(self) -> Tuple[Matrix, TextState, GraphicState]:
-        return (self.ctm, copy(self.textstate), copy(self.graphicstate))
+        # The saved state now shares the graphics state (see
+        # writable_graphicstate)
+        self.gstate_shared = True
+        return (self.ctm, self.textstate.copy(), self.graphicstate)
 
     def set_current_state(
         self,
         state: Tuple[Matrix, TextState, GraphicState],
     ) -> None:
         (self.ctm, self.textstate, self.graphicstate) = state
+        # The restored state may also be saved elsewhere on the stack
+        # or shared with content objects
+        self.gstate_shared = True
+
+    def writable_graphicstate(self) -> GraphicState:
+        """Get the graphics state for modification, copying it first
+        if it is shared with a saved state or a content object."""
+        if self.gstate_shared:
+            self.graphicstate = self.graphicstate.copy()
+            self.gstate_shared = False
+        return self.graphicstate
 
     def __iter__(self) -> Iterator[ContentObject]:
-        parser = ContentParser(self.contents)
-        for _, obj in parser:
+        return self.interpret(obj for _, obj in ContentParser(self.contents))
+
+    def interpret(self, objs: Iterable[PDFObject]) -> Iterator[ContentObject]:
+        """Interpret a sequence of operands and operators."""
+        dispatch = self._dispatch
+        for obj in objs:
             # These are handled inside the parser as they don't obey
             # the normal syntax rules (PDF 1.7 sec 8.9.7)
             if isinstance(obj, InlineImage):
                 yield from self.do_EI(obj)
             elif isinstance(obj, PSKeyword):
-                if obj in self._dispatch:
-                    method, nargs = self._dispatch[obj]
-                    if nargs:
-                        args = self.pop(nargs)
-                        if len(args) != nargs:
-                            log.warning(
-                                "Insufficient arguments (%d) for operator: %r",
-                                len(args),
-                                obj,
-                            )
-                        else:
-                            gen = method(*args)
-                    else:
-                        gen = method()
-                    if gen is not None:
-                        yield from gen
-                else:
+                op = dispatch.get(obj)
+                if op is None:
                     # TODO: This can get very verbose
                     log.warning("Unknown operator: %r", obj)
+                    continue
+                func, nargs = op
+                if nargs:
+                    args = self.pop(nargs)
+                    if len(args) != nargs:
+                        log.warning(
+                            "Insufficient arguments (%d) for operator: %r",
+                            len(args),
+                            obj,
+                        )
+                        continue
+                    gen = func(self, *args)
+                else:
+                    gen = func(self)
+                if gen is not None:
+                    yield from gen
             else:
                 self.push(obj)
 
     def create(self, object_class, **kwargs) -> ContentObject:
+        # The object now shares the graphics state (see
+        # writable_graphicstate)
+        self.gstate_shared = True
         return object_class(
             ctm=self.ctm,
             mcstack=self.mcstack,
@@ -1080,89 +1212,63 @@ class LazyInterpreter:
             **kwargs,
         )
 
-    def do_S(self) -> Iterator[ContentObject]:
-        """Stroke path"""
-        if not self.curpath:
+    def paint_path(
+        self, stroke: bool, fill: bool, evenodd: bool
+    ) -> Iterator[ContentObject]:
+        """Create a path object from the current path (and reset it)"""
+        path = self.curpath
+        if not path:
+            return
+        self.curpath = []
+        # A lone moveto has no geometry, so there is nothing to paint
+        if len(path) == 1 and path[0].operator == "m":
             return
         yield self.create(
             PathObject,
-            stroke=True,
-            fill=False,
-            evenodd=False,
-            raw_segments=self.curpath,
+            stroke=stroke,
+            fill=fill,
+            evenodd=evenodd,
+            raw_segments=path,
         )
-        self.curpath = []
+
+    def do_S(self) -> Iterator[ContentObject]:
+        """Stroke path"""
+        return self.paint_path(stroke=True, fill=False, evenodd=False)
 
     def do_s(self) -> Iterator[ContentObject]:
         """Close and stroke path"""
-        self.do_h()
-        yield from self.do_S()
+        self.curpath.append(PATH_CLOSE)
+        return self.do_S()
 
     def do_f(self) -> Iterator[ContentObject]:
         """Fill path using nonzero winding number rule"""
-        if not self.curpath:
-            return
-        yield self.create(
-            PathObject,
-            stroke=False,
-            fill=True,
-            evenodd=False,
-            raw_segments=self.curpath,
-        )
-        self.curpath = []
+        return self.paint_path(stroke=False, fill=True, evenodd=False)
 
     def do_F(self) -> Iterator[ContentObject]:
         """Fill path using nonzero winding number rule (obsolete)"""
-        yield from self.do_f()
+        return self.do_f()
 
     def do_f_a(self) -> Iterator[ContentObject]:
         """Fill path using even-odd rule"""
-        if not self.curpath:
-            return
-        yield self.create(
-            PathObject,
-            stroke=False,
-            fill=True,
-            evenodd=True,
-            raw_segments=self.curpath,
-        )
-        self.curpath = []
+        return self.paint_path(stroke=False, fill=True, evenodd=True)
 
     def do_B(self) -> Iterator[ContentObject]:
         """Fill and stroke path using nonzero winding number rule"""
-        if not self.curpath:
-            return
-        yield self.create(
-            PathObject,
-            stroke=True,
-            fill=True,
-            evenodd=False,
-            raw_segments=self.curpath,
-        )
-        self.curpath = []
+        return self.paint_path(stroke=True, fill=True, evenodd=False)
 
     def do_B_a(self) -> Iterator[ContentObject]:
         """Fill and stroke path using even-odd rule"""
-        if not self.curpath:
-            return
-        yield self.create(
-            PathObject,
-            stroke=True,
-            fill=True,
-            evenodd=True,
-            raw_segments=self.curpath,
-        )
-        self.curpath = []
+        return self.paint_path(stroke=True, fill=True, evenodd=True)
 
     def do_b(self) -> Iterator[ContentObject]:
         """Close, fill, and stroke path using nonzero winding number rule"""
-        self.do_h()
-        yield from self.do_B()
+        self.curpath.append(PATH_CLOSE)
+        return self.do_B()
 
     def do_b_a(self) -> Iterator[ContentObject]:
         """Close, fill, and stroke path using even-odd rule"""
-        self.do_h()
-        yield from self.do_B_a()
+        self.curpath.append(PATH_CLOSE)
+        return self.do_B_a()
 
     def do_TJ(self, strings: PDFObject) -> Iterator[ContentObject]:
         """Show one or more text strings, allowing individual glyph
@@ -1188,26 +1294,47 @@ class LazyInterpreter:
             for _ in obj:
                 pass
 
+    # Note that these return a generator directly instead of adding
+    # another layer of `yield from`
+
     def do_Tj(self, s: PDFObject) -> Iterator[ContentObject]:
         """Show a text string"""
-        yield from self.do_TJ([s])
-
-    def do__q(self, s: PDFObject) -> None:
+        # No need to go through TJ as there are no adjustments, and
+        # nothing happens at all for an empty string
+        if not isinstance(s, bytes):
+            log.warning("Ignoring non-string %r in text object", s)
+            return iter(())
+        if not s:
+            return iter(())
+        return iter((self.create(TextObject, textstate=self.textstate, args=[s]),))
+
+    def do__q(self, s: PDFObject) -> Iterator[ContentObject]:
         """Move to next line and show text
 
         The ' (single quote) operator.
         """
-        self.do_T_a()
-        self.do_TJ([s])
-
-    def do__w(self, aw: PDFObject, ac: PDFObject, s: PDFObject) -> None:
+        tstate = self.textstate
+        (a, b, c, d, e, f) = tstate.line_matrix
+        leading = tstate.leading
+        tstate.line_matrix = (a, b, c, d, e - leading * c, f - leading * d)
+        tstate.glyph_offset = (0, 0)
+        return self.do_Tj(s)
+
+    def do__w(
+        self, aw: PDFObject, ac: PDFObject, s: PDFObject
+    ) -> Iterator[ContentObject]:
         """Set word and character spacing, move to next line, and show text
 
         The " (double quote) operator.
         """
-        self.do_Tw(aw)
-        self.do_Tc(ac)
-        self.do_TJ([s])
+        tstate = self.textstate
+        tstate.wordspace = num_value(aw)
+        tstate.charspace = num_value(ac)
+        (a, b, c, d, e, f) = tstate.line_matrix
+        leading = tstate.leading
+        tstate.line_matrix = (a, b, c, d, e - leading * c, f - leading * d)
+        tstate.glyph_offset = (0, 0)
+        return self.do_Tj(s)
 
     def do_EI(self, obj: PDFObject) -> Iterator[ContentObject]:
         """End inline image object"""
@@ -1218,11 +1345,22 @@ class LazyInterpreter:
             # FIXME: Do... something?
             pass
 
+    def get_xobject(self, xobjid: PSLiteral) -> ContentStream:
+        """Resolve an XObject, caching the result since the same
+        XObject is often invoked many times."""
+        xobj = self.xobjcache.get(xobjid)
+        if xobj is None:
+            xobj = self.xobjcache[xobjid] = stream_value(self.xobjmap[xobjid.name])
+        return xobj
+
     def do_Do(self, xobjid_arg: PDFObject) -> Iterator[ContentObject]:
         """Invoke named XObject"""
-        xobjid = literal_name(xobjid_arg)
+        if not isinstance(xobjid_arg, PSLiteral):
+            log.debug("Invalid xobject id: %r", xobjid_arg)
+            return
+        xobjid = xobjid_arg.name
         try:
-            xobj = stream_value(self.xobjmap[xobjid])
+            xobj = self.get_xobject(xobjid_arg)
         except KeyError:
             log.debug("Undefined xobject id: %r", xobjid)
             return
@@ -1237,6 +1375,7 @@ class LazyInterpreter:
             # instead of having their own Resources entry.
             xobjres = xobj.get("Resources")
             resources = None if xobjres is None else dict_value(xobjres)
+            self.gstate_shared = True
             xobjobj = XObjectObject(
                 ctm=mult_matrix(matrix, self.ctm),
                 mcstack=self.mcstack,
@@ -1281,6 +1420,7 @@ class LazyInterpreter:
         if isinstance(props, PSLiteral):
             props = self.get_property(props)
         rprops = {} if props is None else dict_value(props)
+        self.gstate_shared = True
         yield TagObject(
             ctm=self.ctm,
             mcstack=self.mcstack,
@@ -1307,37 +1447,64 @@ class LazyInterpreter:
         f1: PDFObject,
     ) -> None:
         """Concatenate matrix to current transformation matrix"""
-        self.ctm = mult_matrix(cast(Matrix, (a1, b1, c1, d1, e1, f1)), self.ctm)
+        (a0, b0, c0, d0, e0, f0) = self.ctm
+        # Same as mult_matrix, unrolled since this is a frequent operator
+        try:
+            self.ctm = (
+                a0 * a1 + c0 * b1,  # type: ignore[operator]
+                b0 * a1 + d0 * b1,  # type: ignore[operator]
+                a0 * c1 + c0 * d1,  # type: ignore[operator]
+                b0 * c1 + d0 * d1,  # type: ignore[operator]
+                a0 * e1 + c0 * f1 + e0,  # type: ignore[operator]
+                b0 * e1 + d0 * f1 + f0,  # type: ignore[operator]
+            )
+        except TypeError:
+            log.warning(
+                "Invalid matrix (%r, %r, %r, %r, %r, %r) for cm",
+                a1,
+                b1,
+                c1,
+                d1,
+                e1,
+                f1,
+            )
 
     def do_w(self, linewidth: PDFObject) -> None:
         """Set line width"""
-        self.graphicstate.linewidth = num_value(linewidth)
+        gstate = self.writable_graphicstate()
+        gstate.linewidth = num_value(linewidth)
 
     def do_J(self, linecap: PDFObject) -> None:
         """Set line cap style"""
-        self.graphicstate.linecap = int_value(linecap)
+        gstate = self.writable_graphicstate()
+        gstate.linecap = int_value(linecap)
 
     def do_j(self, linejoin: PDFObject) -> None:
         """Set line join style"""
-        self.graphicstate.linejoin = int_value(linejoin)
+        gstate = self.writable_graphicstate()
+        gstate.linejoin = int_value(linejoin)
 
     def do_M(self, miterlimit: PDFObject) -> None:
         """Set miter limit"""
-        self.graphicstate.miterlimit = num_value(miterlimit)
+        gstate = self.writable_graphicstate()
+        gstate.miterlimit = num_value(miterlimit)
 
     def do_d(self, dash: PDFObject, phase: PDFObject) -> None:
         """Set line dash pattern"""
+        gstate = self.writable_graphicstate()
         ndash = tuple(num_value(x) for x in list_value(dash))
-        self.graphicstate.dash = DashPattern(ndash, num_value(phase))
+        gstate.dash = DashPattern(ndash, num_value(phase))
 
     def do_ri(self, intent: PDFObject) -> None:
         """Set color rendering intent"""
+        gstate = self.writable_graphicstate()
         # FIXME: Should actually be a (runtime checked) enum
-        self.graphicstate.intent = cast(PSLiteral, intent)
+        gstate.intent = cast(PSLiteral, intent)
 
     def do_i(self, flatness: PDFObject) -> None:
         """Set flatness tolerance"""
-        self.graphicstate.flatness = num_value(flatness)
+        gstate = self.writable_graphicstate()
+        gstate.flatness = num_value(flatness)
 
     def do_gs(self, name: PDFObject) -> None:
         """Set parameters from graphics state parameter dictionary"""
@@ -1392,7 +1559,7 @@ class LazyInterpreter:
 
     def do_h(self) -> None:
         """Close subpath"""
-        self.curpath.append(make_seg("h"))
+        self.curpath.append(PATH_CLOSE)
 
     def do_re(self, x: PDFObject, y: PDFObject, w: PDFObject, h: PDFObject) -> None:
         """Append rectangle to path"""
@@ -1400,11 +1567,17 @@ class LazyInterpreter:
         y = num_value(y)
         w = num_value(w)
         h = num_value(h)
-        self.curpath.append(make_seg("m", point_value(x, y)))
-        self.curpath.append(make_seg("l", point_value(x + w, y)))
-        self.curpath.append(make_seg("l", point_value(x + w, y + h)))
-        self.curpath.append(make_seg("l", point_value(x, y + h)))
-        self.curpath.append(make_seg("h"))
+        x1 = x + w
+        y1 = y + h
+        self.curpath.extend(
+            (
+                PathSegment("m", ((x, y),)),
+                PathSegment("l", ((x1, y),)),
+                PathSegment("l", ((x1, y1),)),
+                PathSegment("l", ((x, y1),)),
+                PATH_CLOSE,
+            )
+        )
 
     def do_n(self) -> None:
         """End path without filling or stroking"""
@@ -1421,65 +1594,71 @@ class LazyInterpreter:
 
         Introduced in PDF 1.1
         """
+        gstate = self.writable_graphicstate()
         try:
-            self.graphicstate.scs = self.csmap[literal_name(name)]
+            gstate.scs = self.csmap[literal_name(name)]
         except KeyError:
             log.warning("Undefined ColorSpace: %r", name)
 
     def do_cs(self, name: PDFObject) -> None:
         """Set color space for nonstroking operators"""
+        gstate = self.writable_graphicstate()
         try:
-            self.graphicstate.ncs = self.csmap[literal_name(name)]
+            gstate.ncs = self.csmap[literal_name(name)]
         except KeyError:
             log.warning("Undefined ColorSpace: %r", name)
 
     def do_G(self, gray: PDFObject) -> None:
         """Set gray level for stroking operators"""
-        self.graphicstate.scs = self.csmap["DeviceGray"]
-        self.graphicstate.scolor = self.graphicstate.scs.make_color(gray)
+        gstate = self.writable_graphicstate()
+        gstate.scs = DEVICE_GRAY
+        gstate.scolor = DEVICE_GRAY.make_color(gray)
 
     def do_g(self, gray: PDFObject) -> None:
         """Set gray level for nonstroking operators"""
-        self.graphicstate.ncs = self.csmap["DeviceGray"]
-        self.graphicstate.ncolor = self.graphicstate.ncs.make_color(gray)
+        gstate = self.writable_graphicstate()
+        gstate.ncs = DEVICE_GRAY
+        gstate.ncolor = DEVICE_GRAY.make_color(gray)
 
     def do_RG(self, r: PDFObject, g: PDFObject, b: PDFObject) -> None:
         """Set RGB color for stroking operators"""
-        self.graphicstate.scs = self.csmap["DeviceRGB"]
-        self.graphicstate.scolor = self.graphicstate.scs.make_color(r, g, b)
+        gstate = self.writable_graphicstate()
+        gstate.scs = DEVICE_RGB
+        gstate.scolor = DEVICE_RGB.make_color(r, g, b)
 
     def do_rg(self, r: PDFObject, g: PDFObject, b: PDFObject) -> None:
         """Set RGB color for nonstroking operators"""
-        self.graphicstate.ncs = self.csmap["DeviceRGB"]
-        self.graphicstate.ncolor = self.graphicstate.ncs.make_color(r, g, b)
+        gstate = self.writable_graphicstate()
+        gstate.ncs = DEVICE_RGB
+        gstate.ncolor = DEVICE_RGB.make_color(r, g, b)
 
     def do_K(self, c: PDFObject, m: PDFObject, y: PDFObject, k: PDFObject) -> None:
         """Set CMYK color for stroking operators"""
-        self.graphicstate.scs = self.csmap["DeviceCMYK"]
-        self.graphicstate.scolor = self.graphicstate.scs.make_color(c, m, y, k)
+        gstate = self.writable_graphicstate()
+        gstate.scs = DEVICE_CMYK
+        gstate.scolor = DEVICE_CMYK.make_color(c, m, y, k)
 
     def do_k(self, c: PDFObject, m: PDFObject, y: PDFObject, k: PDFObject) -> None:
         """Set CMYK color for nonstroking operators"""
-        self.graphicstate.ncs = self.csmap["DeviceCMYK"]
-        self.graphicstate.ncolor = self.graphicstate.ncs.make_color(c, m, y, k)
+        gstate = self.writable_graphicstate()
+        gstate.ncs = DEVICE_CMYK
+        gstate.ncolor = DEVICE_CMYK.make_color(c, m, y, k)
 
     def do_SCN(self) -> None:
         """Set color for stroking operators."""
-        if self.graphicstate.scs is None:
+        gstate = self.writable_graphicstate()
+        if gstate.scs is None:
             log.warning("No colorspace specified, using default DeviceGray")
-            self.graphicstate.scs = self.csmap["DeviceGray"]
-        self.graphicstate.scolor = self.graphicstate.scs.make_color(
-            *self.pop(self.graphicstate.scs.ncomponents)
-        )
+            gstate.scs = DEVICE_GRAY
+        gstate.scolor = gstate.scs.make_color(*self.pop(gstate.scs.ncomponents))
 
     def do_scn(self) -> None:
         """Set color for nonstroking operators"""
-        if self.graphicstate.ncs is None:
+        gstate = self.writable_graphicstate()
+        if gstate.ncs is None:
             log.warning("No colorspace specified, using default DeviceGray")
-            self.graphicstate.ncs = self.csmap["DeviceGray"]
-        self.graphicstate.ncolor = self.graphicstate.ncs.make_color(
-            *self.pop(self.graphicstate.ncs.ncomponents)
-        )
+            gstate.ncs = DEVICE_GRAY
+        gstate.ncolor = gstate.ncs.make_color(*self.pop(gstate.ncs.ncomponents))
 
     def do_SC(self) -> None:
         """Set color for stroking operators"""
@@ -1552,16 +1731,18 @@ class LazyInterpreter:
             of the current resource dictionary
         :param fontsize: size is a number representing a scale factor.
         """
-        try:
-            self.textstate.font = self.fontmap[literal_name(fontid)]
-        except KeyError:
-            log.warning("Undefined Font id: %r", fontid)
-            doc = _deref_document(self.page.docref)
-            self.textstate.font = doc.get_font(None, {})
-        self.textstate.fontsize = num_value(fontsize)
-        self.textstate.descent = (
-            self.textstate.font.get_descent() * self.textstate.fontsize
-        )
+        font = self.fontlits.get(fontid)  # type: ignore[arg-type]
+        if font is None:
+            try:
+                font = self.fontmap[literal_name(fontid)]
+            except KeyError:
+                log.warning("Undefined Font id: %r", fontid)
+                doc = _deref_document(self.page.docref)
+                font = doc.get_font(None, {})
+        tstate = self.textstate
+        tstate.font = font
+        tstate.fontsize = num_value(fontsize)
+        tstate.descent = font.get_descent() * tstate.fontsize
 
     def do_Tr(self, render: PDFObject) -> None:
         """Set the text rendering mode"""
@@ -1579,16 +1760,25 @@ class LazyInterpreter:
 
         Offset from the start of the current line by (tx , ty).
         """
+        tstate = self.textstate
         try:
-            tx = num_value(tx)
-            ty = num_value(ty)
-            (a, b, c, d, e, f) = self.textstate.line_matrix
-            e_new = tx * a + ty * c + e
-            f_new = tx * b + ty * d + f
-            self.textstate.line_matrix = (a, b, c, d, e_new, f_new)
+            # Operands are nearly always numbers already
+            if not isinstance(tx, (int, float)):
+                tx = num_value(tx)
+            if not isinstance(ty, (int, float)):
+                ty = num_value(ty)
+            (a, b, c, d, e, f) = tstate.line_matrix
+            tstate.line_matrix = (
+                a,
+                b,
+                c,
+                d,
+                tx * a + ty * c + e,
+                tx * b + ty * d + f,
+            )
         except TypeError:
             log.warning("Invalid offset (%r, %r) for Td", tx, ty)
-        self.textstate.glyph_offset = (0, 0)
+        tstate.glyph_offset = (0, 0)
 
     def do_TD(self, tx: PDFObject, ty: PDFObject) -> None:
         """Move to the start of the next line.
@@ -1600,7 +1790,15 @@ class LazyInterpreter:
             −ty TL
             tx ty Td
         """
-        self.do_TL(-num_value(ty))
+        try:
+            if not isinstance(tx, (int, float)):
+                tx = num_value(tx)
+            if not isinstance(ty, (int, float)):
+                ty = num_value(ty)
+        except TypeError:
+            log.warning("Invalid offset (%r, %r) for TD", tx, ty)
+            return
+        self.textstate.leading = -ty
         self.do_Td(tx, ty)
 
     def do_Tm(
@@ -1613,7 +1811,8 @@ class LazyInterpreter:
         f: PDFObject,
     ) -> None:
         """Set text matrix and text line matrix"""
-        self.textstate.line_matrix = (
+        tstate = self.textstate
+        tstate.line_matrix = (
             num_value(a),
             num_value(b),
             num_value(c),
@@ -1621,20 +1820,15 @@ class LazyInterpreter:
             num_value(e),
             num_value(f),
         )
-        self.textstate.glyph_offset = (0, 0)
+        tstate.glyph_offset = (0, 0)
 
     def do_T_a(self) -> None:
         """Move to start of next text line"""
-        (a, b, c, d, e, f) = self.textstate.line_matrix
-        self.textstate.line_matrix = (
-            a,
-            b,
-            c,
-            d,
-            -self.textstate.leading * c + e,
-            -self.textstate.leading * d + f,
-        )
-        self.textstate.glyph_offset = (0, 0)
+        tstate = self.textstate
+        (a, b, c, d, e, f) = tstate.line_matrix
+        leading = tstate.leading
+        tstate.line_matrix = (a, b, c, d, e - leading * c, f - leading * d)
+        tstate.glyph_offset = (0, 0)
 
     def do_BI(self) -> None:
         """Begin inline image object"""
@@ -1681,7 +1875,7 @@ class LazyInterpreter:
     def begin_tag(self, tag: PDFObject, props: Dict[str, PDFObject]) -> None:
         """Handle beginning of tag, setting current MCID if any."""
         assert isinstance(tag, PSLiteral)
-        tag = decode_text(tag.name)
+        tag = tag_name(tag.name)
         if "MCID" in props:
             mcid = int_value(props["MCID"])
         else:
@@ -2,11 +2,10 @@ import logging
 import mmap
 import re
 from binascii import unhexlify
-from collections import deque
+from itertools import product
 from typing import (
     TYPE_CHECKING,
     Any,
-    Deque,
     Dict,
     Iterator,
     List,
@@ -24,12 +23,12 @@ from playa.pdftypes import (
     ContentStream,
     ObjRef,
     PSKeyword,
+    PSKeywordTable,
     PSLiteral,
     int_value,
     literal_name,
     name_str,
 )
-from playa.utils import choplist
 
 log = logging.getLogger(__name__)
 if TYPE_CHECKING:
@@ -75,6 +74,17 @@ ESC_STRING = {
     b")": 41,
     b"\\": 92,
 }
+# Byte values of escape sequences in strings, indexed by the character
+# following the REVERSE SOLIDUS.  PDF 1.7 sec 7.3.4.2: If the
+# character following the REVERSE SOLIDUS is not one of those shown in
+# Table 3, the REVERSE SOLIDUS shall be ignored.
+ESC_TABLE = bytes(ESC_STRING.get(bytes((c,)), c) for c in range(256))
+# Values of all possible octal escapes in strings (from 1 to 3 digits)
+OCTAL_ESCAPES = {
+    b"\\" + bytes(digits): int(bytes(digits), 8)
+    for ndigits in (1, 2, 3)
+    for digits in product(OCTAL, repeat=ndigits)
+}
 
 
 def reverse_iter_lines(buffer: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, bytes]]:
@@ -83,9 +93,14 @@ def reverse_iter_lines(buffer: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, b
     This is used to locate the trailers at the end of a file.
     """
     pos = endline = len(buffer)
+    if isinstance(buffer, mmap.mmap) and hasattr(mmap, "MADV_WILLNEED"):
+        # Ask the OS to read ahead the end of the file, where the
+        # trailers are (the start must be page-aligned)
+        start = max(0, pos - 65536) // mmap.PAGESIZE * mmap.PAGESIZE
+        buffer.madvise(mmap.MADV_WILLNEED, start)
+    nidx = buffer.rfind(b"\n", 0, pos)
+    ridx = buffer.rfind(b"\r", 0, pos)
     while True:
-        nidx = buffer.rfind(b"\n", 0, pos)
-        ridx = buffer.rfind(b"\r", 0, pos)
         best = max(nidx, ridx)
         yield best + 1, buffer[best + 1 : endline]
         if best == -1:
@@ -94,21 +109,43 @@ def reverse_iter_lines(buffer: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, b
         pos = best
         if pos > 0 and buffer[pos - 1 : pos + 1] == b"\r\n":
             pos -= 1
+        # Only search again for the EOL characters we have passed,
+        # otherwise a file with only CR (or only LF) line endings
+        # would be rescanned to the beginning for every line
+        if nidx >= pos:
+            nidx = buffer.rfind(b"\n", 0, pos)
+        if ridx >= pos:
+            ridx = buffer.rfind(b"\r", 0, pos)
 
 
 Token = Union[float, bool, PSLiteral, PSKeyword, bytes]
+# Maximum number of entries in each of the token caches below, which
+# live as long as the process, so that hostile input cannot make them
+# grow without limit (tokens past this are simply not cached)
+TOKEN_CACHE_SIZE = 4096
+# Keywords (and booleans) by their raw bytes, so that the lexer can
+# look them up directly without going through KWD()
+KEYWORD_TOKENS: Dict[bytes, Token] = {b"true": True, b"false": False}
+KEYWORD_TOKENS.update(PSKeywordTable.dict)
+# Likewise for names, keyed by their raw bytes (including the slash
+# and any escapes)
+NAME_TOKENS: Dict[bytes, PSLiteral] = {}
+# Whitespace and comments are skipped as part of matching the
+# following token, so that there is only one match per token (and thus
+# the token pattern must always match, even at the end of the data)
 LEXER = re.compile(
-    rb"""(?:
-      (?P<whitespace> \s+)
-    | (?P<comment> %[^\r\n]*[\r\n])
-    | (?P<name> /(?: \#[A-Fa-f\d][A-Fa-f\d] | [^#/%\[\]()<>{}\s])+ )
-    | (?P<number> [-+]? (?: \d*\.\d+ | \d+ ) )
+    rb"""(?: \s | %[^\r\n]*[\r\n] )*
+(?:
+      (?P<int> [-+]? \d+ (?! \.?\d ) )
+    | (?P<float> [-+]? \d*\.\d+ )
     | (?P<keyword> [A-Za-z] [^#/%\[\]()<>{}\s]*)
+    | (?P<name> /(?: \#[A-Fa-f\d][A-Fa-f\d] | [^#/%\[\]()<>{}\s])+ )
     | (?P<startstr> \([^()\\]*)
     | (?P<hexstr> <[A-Fa-f\d\s]*>)
     | (?P<startdict> <<)
     | (?P<enddict> >>)
     | (?P<other> .)
+    | (?P<eof> \Z)
 )
 """,
     re.VERBOSE,
@@ -121,13 +158,11 @@ STRLEXER = re.compile(
     | (?P<parenleft> \()
     | (?P<parenright> \))
     | (?P<newline> \r\n?|\n)
-    | (?P<other> .)
+    | (?P<other> [^\\()\r\n]+ | .)
 )""",
     re.VERBOSE,
 )
-HEXDIGIT = re.compile(rb"#([A-Fa-f\d][A-Fa-f\d])")
 EOLR = re.compile(rb"\r\n?|\n")
-SPC = re.compile(rb"\s")
 
 
 class Lexer:
@@ -137,14 +172,10 @@ class Lexer:
         self.data = data
         self.pos = pos
         self.end = len(data)
-        self._tokens: Deque[Tuple[int, Token]] = deque()
 
     def seek(self, pos: int) -> None:
         """Seek to a position and reinitialize parser state."""
         self.pos = pos
-        self._curtoken = b""
-        self._curtokenpos = 0
-        self._tokens.clear()
 
     def tell(self) -> int:
         """Get the current position in the buffer."""
@@ -197,91 +228,90 @@ class Lexer:
     def __next__(self) -> Tuple[int, Token]:
         """Get the next token in iteration, raising StopIteration when
         done."""
-        while True:
-            m = LEXER.match(self.data, self.pos)
-            if m is None:  # can only happen at EOS
-                raise StopIteration
-            self._curtokenpos = m.start()
-            self.pos = m.end()
-            if m.lastgroup not in ("whitespace", "comment"):  # type: ignore
-                # Okay, we got a token or something
-                break
-        self._curtoken = m[0]
-        if m.lastgroup == "name":  # type: ignore
-            self._curtoken = m[0][1:]
-            self._curtoken = HEXDIGIT.sub(
-                lambda x: bytes((int(x[1], 16),)), self._curtoken
-            )
-            tok = LIT(name_str(self._curtoken))
-            return (self._curtokenpos, tok)
-        if m.lastgroup == "number":  # type: ignore
-            if b"." in self._curtoken:
-                return (self._curtokenpos, float(self._curtoken))
-            else:
-                return (self._curtokenpos, int(self._curtoken))
-        if m.lastgroup == "startdict":  # type: ignore
-            return (self._curtokenpos, KEYWORD_DICT_BEGIN)
-        if m.lastgroup == "enddict":  # type: ignore
-            return (self._curtokenpos, KEYWORD_DICT_END)
-        if m.lastgroup == "startstr":  # type: ignore
-            return self._parse_endstr(self.data[m.start() + 1 : m.end()], m.end())
-        if m.lastgroup == "hexstr":  # type: ignore
-            self._curtoken = SPC.sub(b"", self._curtoken[1:-1])
-            if len(self._curtoken) % 2 == 1:
-                self._curtoken += b"0"
-            return (self._curtokenpos, unhexlify(self._curtoken))
+        m = LEXER.match(self.data, self.pos)
+        assert m is not None
+        group = m.lastgroup
+        if group == "eof":
+            raise StopIteration
+        self.pos = m.end()
+        # Tested in (rough) order of frequency in content streams
+        tokpos = m.start(group)  # type: ignore[arg-type]
+        token = m[group]  # type: ignore[index]
+        if group == "int":
+            return (tokpos, int(token))
+        if group == "float":
+            return (tokpos, float(token))
+        if group == "name":
+            lit = NAME_TOKENS.get(token)
+            if lit is None:
+                name = token[1:]
+                if b"#" in name:
+                    # The lexer guarantees that every # is followed by
+                    # two hex digits
+                    first, *rest = name.split(b"#")
+                    name = first + b"".join(
+                        bytes.fromhex(part[:2].decode("ascii")) + part[2:]
+                        for part in rest
+                    )
+                lit = LIT(name_str(name))
+                if len(NAME_TOKENS) < TOKEN_CACHE_SIZE:
+                    NAME_TOKENS[token] = lit
+            return (tokpos, lit)
+        if group == "startstr":
+            return (tokpos, self._parse_endstr(token[1:], self.pos))
+        if group == "startdict":
+            return (tokpos, KEYWORD_DICT_BEGIN)
+        if group == "enddict":
+            return (tokpos, KEYWORD_DICT_END)
+        if group == "hexstr":
+            token = token[1:-1].translate(None, WHITESPACE)
+            if len(token) % 2 == 1:
+                token += b"0"
+            return (tokpos, unhexlify(token))
         # Anything else is treated as a keyword (whether explicitly matched or not)
-        if self._curtoken == b"true":
-            return (self._curtokenpos, True)
-        elif self._curtoken == b"false":
-            return (self._curtokenpos, False)
-        else:
-            return (self._curtokenpos, KWD(self._curtoken))
-
-    def _parse_endstr(self, start: bytes, pos: int) -> Tuple[int, Token]:
+        kwd = KEYWORD_TOKENS.get(token)
+        if kwd is None:
+            kwd = KWD(token)
+            if len(KEYWORD_TOKENS) < TOKEN_CACHE_SIZE:
+                KEYWORD_TOKENS[token] = kwd
+        return (tokpos, kwd)
+
+    def _parse_endstr(self, start: bytes, pos: int) -> bytes:
         """Parse the remainder of a string."""
         # Handle nonsense CRLF conversion in strings (PDF 1.7, p.15)
-        parts = [EOLR.sub(b"\n", start)]
+        buf = bytearray(EOLR.sub(b"\n", start))
         paren = 1
         for m in STRLEXER.finditer(self.data, pos):
             self.pos = m.end()
-            if m.lastgroup == "parenright":  # type: ignore
+            if m.lastgroup == "other":  # type: ignore
+                buf += m[0]
+            elif m.lastgroup == "parenright":  # type: ignore
                 paren -= 1
                 if paren == 0:
                     # By far the most common situation!
                     break
-                parts.append(m[0])
+                buf += b")"
             elif m.lastgroup == "parenleft":  # type: ignore
-                parts.append(m[0])
+                buf += b"("
                 paren += 1
             elif m.lastgroup == "escape":  # type: ignore
-                chr = m[0][1:2]
-                if chr not in ESC_STRING:
-                    # PDF 1.7 sec 7.3.4.2: If the character following
-                    # the REVERSE SOLIDUS is not one of those shown in
-                    # Table 3, the REVERSE SOLIDUS shall be ignored.
-                    parts.append(chr)
-                else:
-                    parts.append(bytes((ESC_STRING[chr],)))
+                buf.append(ESC_TABLE[m[0][1]])
             elif m.lastgroup == "octal":  # type: ignore
-                chrcode = int(m[0][1:], 8)
+                chrcode = OCTAL_ESCAPES[m[0]]
                 if chrcode >= 256:
                     # PDF1.7 p.16: "high-order overflow shall be
                     # ignored."
                     log.warning("Invalid octal %r (%d)", m[0][1:], chrcode)
                 else:
-                    parts.append(bytes((chrcode,)))
+                    buf.append(chrcode)
             elif m.lastgroup == "newline":  # type: ignore
                 # Handle nonsense CRLF conversion in strings (PDF 1.7, p.15)
-                parts.append(b"\n")
-            elif m.lastgroup == "linebreak":  # type: ignore
-                pass
-            else:
-                parts.append(m[0])
+                buf += b"\n"
+            # Escaped line breaks (m.lastgroup == "linebreak") are ignored
         if paren != 0:
             log.warning("Unterminated string at %d", pos)
             raise StopIteration
-        return (self._curtokenpos, b"".join(parts))
+        return bytes(buf)
 
 
 class InlineImage(ContentStream):
@@ -305,6 +335,22 @@ PDFObject = Union[
     None,
 ]
 StackEntry = Tuple[int, PDFObject]
+# Keywords which ObjectParser has to act on, every other token is
+# simply pushed on the stack
+STRUCTURAL_KEYWORDS = frozenset(
+    (
+        KEYWORD_ARRAY_BEGIN,
+        KEYWORD_ARRAY_END,
+        KEYWORD_DICT_BEGIN,
+        KEYWORD_DICT_END,
+        KEYWORD_PROC_BEGIN,
+        KEYWORD_PROC_END,
+        KEYWORD_NULL,
+        KEYWORD_R,
+        KEYWORD_BI,
+        KEYWORD_ID,
+    )
+)
 
 
 class ObjectParser:
@@ -357,15 +403,21 @@ class ObjectParser:
             if self.stack and top is None:
                 return self.stack.pop()
             (pos, token) = self.nexttoken()
-            if token is KEYWORD_ARRAY_BEGIN:
+            if token not in STRUCTURAL_KEYWORDS:
+                # Literally anything else, including any other keyword
+                # (will be returned above if top is None, or later if
+                # we are inside some object)
+                self.stack.append((pos, token))
+            elif token is KEYWORD_ARRAY_BEGIN:
                 if top is None:
                     top = pos
                 self.stack.append((pos, token))
             elif token is KEYWORD_ARRAY_END:
-                try:
-                    pos, obj = self.pop_to(KEYWORD_ARRAY_BEGIN)
-                except TypeError as e:
-                    log.warning(f"When constructing array: {e}")
+                result = self.pop_to(KEYWORD_ARRAY_BEGIN)
+                if result is None:
+                    log.warning("Ignoring unmatched end of array at %d", pos)
+                    continue
+                pos, obj = result
                 if pos == top:
                     top = None
                     return pos, obj
@@ -375,20 +427,21 @@ class ObjectParser:
                     top = pos
                 self.stack.append((pos, token))
             elif token is KEYWORD_DICT_END:
-                try:
-                    (pos, objs) = self.pop_to(KEYWORD_DICT_BEGIN)
-                    if len(objs) % 2 != 0:
-                        error_msg = (
-                            "Dictionary contains odd number of objects: %r" % objs
-                        )
-                        raise PDFSyntaxError(error_msg)
-                    obj = {
-                        literal_name(k): v
-                        for (k, v) in choplist(2, objs)
-                        if v is not None
-                    }
-                except TypeError as e:
-                    log.warning(f"When constructing dict: {e}")
+                result = self.pop_to(KEYWORD_DICT_BEGIN)
+                if result is None:
+                    log.warning("Ignoring unmatched end of dictionary at %d", pos)
+                    continue
+                (pos, objs) = result
+                if len(objs) % 2 != 0:
+                    error_msg = "Dictionary contains odd number of objects: %r" % objs
+                    raise PDFSyntaxError(error_msg)
+                obj = {}
+                it = iter(objs)
+                for k, v in zip(it, it):
+                    if not isinstance(k, PSLiteral):
+                        log.warning("Ignoring invalid dictionary key %r", k)
+                    elif v is not None:
+                        obj[k.name] = v
                 if pos == top:
                     top = None
                     return pos, obj
@@ -398,10 +451,11 @@ class ObjectParser:
                     top = pos
                 self.stack.append((pos, token))
             elif token is KEYWORD_PROC_END:
-                try:
-                    pos, obj = self.pop_to(KEYWORD_PROC_BEGIN)
-                except TypeError as e:
-                    log.warning(f"When constructing proc: {e}")
+                result = self.pop_to(KEYWORD_PROC_BEGIN)
+                if result is None:
+                    log.warning("Ignoring unmatched end of procedure at %d", pos)
+                    continue
+                pos, obj = result
                 if pos == top:
                     top = None
                     return pos, obj
@@ -430,13 +484,15 @@ class ObjectParser:
                 self.stack.append((pos, token))
             elif token is KEYWORD_ID:
                 idpos = pos
-                (pos, objs) = self.pop_to(KEYWORD_BI)
+                result = self.pop_to(KEYWORD_BI)
+                if result is None:
+                    raise PDFSyntaxError(f"Inline image data without BI at {pos}")
+                (pos, objs) = result
                 if len(objs) % 2 != 0:
                     error_msg = f"Invalid dictionary construct: {objs!r}"
                     raise TypeError(error_msg)
-                dic = {
-                    literal_name(k): v for (k, v) in choplist(2, objs) if v is not None
-                }
+                it = iter(objs)
+                dic = {literal_name(k): v for (k, v) in zip(it, it) if v is not None}
                 # First try EI preceded by newline, because some
                 # badly-behaved PDFs contain inline images without
                 # ASCII85Decode encoding but nonetheless with "EI" in
@@ -457,13 +513,24 @@ class ObjectParser:
                     # of image data.
                     self.seek(idpos + len(KEYWORD_ID.name) + 1)
                     (eipos, data) = self.get_inline_data(target=eos)
+                    # Remove the end of stream marker and any preceding
+                    # EOL in a single slice
                     if eipos == -1:
                         # Try again with just plain b"EI"
                         self.seek(idpos + len(KEYWORD_ID.name) + 1)
                         (eipos, data) = self.get_inline_data(target=b"EI")
-                        data = re.sub(rb"(?:\r\n|[\r\n])$", b"", data[: -len(eos)])
+                        # Also remove the byte preceding "EI" (which
+                        # should be whitespace), then any EOL before it
+                        end = max(0, len(data) - len(eos))
+                        if data.endswith(b"\r\n", 0, end):
+                            end -= 2
+                        elif data.endswith((b"\r", b"\n"), 0, end):
+                            end -= 1
                     else:
-                        data = re.sub(rb"\r$", b"", data[: -len(eos)])
+                        end = len(data) - len(eos)
+                        if data.endswith(b"\r", 0, end):
+                            end -= 1
+                    data = data[:end]
                 else:
                     # Note absence of + 1 here (the "Unless" above)
                     self.seek(idpos + len(KEYWORD_ID.name))
@@ -484,22 +551,18 @@ class ObjectParser:
                 ), f"Inline image {obj} not at top level of stream ({pos} != {top}, {self.stack})"
                 top = None
                 return pos, obj
-            else:
-                # Literally anything else, including any other keyword
-                # (will be returned above if top is None, or later if
-                # we are inside some object)
-                self.stack.append((pos, token))
 
-    def pop_to(self, token: PSKeyword) -> Tuple[int, List[PDFObject]]:
-        """Pop everything from the stack back to token."""
-        context: List[PDFObject] = []
-        while self.stack:
-            pos, last = self.stack.pop()
+    def pop_to(self, token: PSKeyword) -> Union[Tuple[int, List[PDFObject]], None]:
+        """Pop everything from the stack back to token, returning None
+        (and leaving the stack untouched) if it is not there."""
+        stack = self.stack
+        for idx in range(len(stack) - 1, -1, -1):
+            pos, last = stack[idx]
             if last is token:
-                context.reverse()
+                context = [obj for _, obj in stack[idx + 1 :]]
+                del stack[idx:]
                 return pos, context
-            context.append(last)
-        raise PDFSyntaxError(f"Unmatched end token {token!r}")
+        return None
 
     # Delegation follows
     def seek(self, pos: int) -> None:
@@ -656,22 +719,14 @@ class IndirectObjectParser:
                     if line not in (b"\n", b"\r\n", b"endstream\n", b"endstream\r\n"):
                         log.warning("Expected newline or 'endstream', got %r", line)
                 else:
-                    # Reuse that line and read more if necessary
-                    while True:
-                        if b"endstream" in line:
-                            idx = line.index(b"endstream")
-                            objlen += idx
-                            data += line[:idx]
-                            self._parser.seek(pos + objlen)
-                            break
-                        objlen += len(line)
-                        data += line
-                        linepos, line = self._parser.nextline()
-                        if line == b"":  # Means EOF
-                            log.warning(
-                                "Incorrect length for stream, no 'endstream' found"
-                            )
-                            break
+                    # Search the whole buffer for the end of the stream
+                    # rather than scanning it line by line
+                    end = self.buffer.find(b"endstream", linepos)
+                    if end == -1:
+                        log.warning("Incorrect length for stream, no 'endstream' found")
+                        end = len(self.buffer)
+                    data += self.buffer[linepos:end]
+                    self._parser.seek(end)
                 doc = self.doc
                 stream = ContentStream(
                     dic, bytes(data), None if doc is None else doc.decipher
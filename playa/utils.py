@@ -181,9 +181,9 @@ def normalize_rect(r: Rect) -> Rect:
 
 
 def mult_matrix(m1: Matrix, m0: Matrix) -> Matrix:
+    """Returns the multiplication of two matrices."""
     (a1, b1, c1, d1, e1, f1) = m1
     (a0, b0, c0, d0, e0, f0) = m0
-    """Returns the multiplication of two matrices."""
     return (
         a0 * a1 + c0 * b1,
         b0 * a1 + d0 * b1,
@@ -2,6 +2,7 @@
 Test the ContentObject API for pages.
 """
 
+import dataclasses
 import itertools
 from pathlib import Path
 from typing import cast
@@ -11,7 +12,20 @@ import pytest
 import playa
 from playa.color import PREDEFINED_COLORSPACE, Color
 from playa.exceptions import PDFEncryptionError
-from playa.utils import get_transformed_bound, get_bound, apply_matrix_pt, Matrix
+from playa.page import (
+    DashPattern,
+    GraphicState,
+    MarkedContent,
+    TagObject,
+    TextState,
+)
+from playa.utils import (
+    MATRIX_IDENTITY,
+    Matrix,
+    apply_matrix_pt,
+    get_bound,
+    get_transformed_bound,
+)
 
 from .data import TESTDIR, ALLPDFS, PASSWORDS, XFAILS, CONTRIB
 
@@ -156,3 +170,88 @@ def test_operators_in_text() -> None:
                 assert isinstance(t.mcs.props["ActualText"], bytes)
                 assert t.mcs.props["ActualText"].decode("utf-16") == "x̌"
             assert t.mcid == 0
+
+
+def test_quote_operators() -> None:
+    """Verify that the ' and " operators actually show text."""
+    with playa.open(TESTDIR / "zen_of_python_corrupted.pdf") as pdf:
+        texts = [t.chars for t in pdf.pages[0].texts]
+        assert texts[:3] == [
+            "Beautiful is better than ugly.",
+            "Explicit is better than implicit.",
+            "Simple is better than complex.",
+        ]
+
+
+def test_state_copy() -> None:
+    """Verify that copying text and graphics states copies everything."""
+    tstate = TextState(fontsize=12, charspace=1.5, render_mode=3, rise=2)
+    tcopy = tstate.copy()
+    assert tcopy == tstate
+    assert tcopy is not tstate
+    gstate = GraphicState(linewidth=2, dash=DashPattern((1, 2), 1), flatness=3)
+    gcopy = gstate.copy()
+    assert gcopy == gstate
+    assert gcopy is not gstate
+    # Make sure no field is missed or swapped, even if new ones are added
+    for cls in (TextState, GraphicState):
+        state = cls()
+        for field in dataclasses.fields(cls):
+            setattr(state, field.name, object())
+        copy = state.copy()
+        for field in dataclasses.fields(cls):
+            assert getattr(copy, field.name) is getattr(state, field.name)
+
+
+def test_tag_mcid() -> None:
+    """Verify that tags without an MCID get it from the enclosing
+    marked content sections."""
+    tag = TagObject(
+        gstate=GraphicState(),
+        ctm=MATRIX_IDENTITY,
+        mcstack=[MarkedContent(mcid=3, tag="P", props={})],
+        _mcs=MarkedContent(mcid=None, tag="Span", props={}),
+    )
+    assert tag.mcid == 3
+    tag.mcstack = []
+    assert tag.mcid is None
+
+
+@pytest.mark.skipif(not CONTRIB.exists(), reason="contrib samples not present")
+def test_tag_mcid_page() -> None:
+    """Verify that we can iterate over marked content tags without an
+    MCID and get their MCIDs."""
+    with playa.open(CONTRIB / "issue_566_test_2.pdf") as pdf:
+        mcids = {
+            obj.mcid
+            for page in pdf.pages
+            for obj in page
+            if isinstance(obj, TagObject) and obj.mcs.mcid is None
+        }
+        assert mcids == {60, None}
+
+
+def test_gstate_not_shared() -> None:
+    """Verify that objects keep the graphics state they were created with."""
+    with playa.open(TESTDIR / "graphics_state_in_text_object.pdf") as pdf:
+        page = pdf.pages[0]
+        streamed = [obj.gstate.copy() for obj in page]
+        stored = [obj.gstate for obj in list(page)]
+        assert streamed == stored
+
+
+def test_char_spacing() -> None:
+    """Verify that character spacing is added after every glyph."""
+    with playa.open(TESTDIR / "font-size-test.pdf") as pdf:
+        text = next(pdf.pages[0].texts)
+        glyphs = list(text)
+        tstate = text.textstate
+        assert tstate.charspace == -0.013
+        assert tstate.fontsize == 1
+        adjust = sum(x for x in text.args if isinstance(x, (int, float)))
+        x, _ = tstate.glyph_offset
+        assert x == pytest.approx(
+            sum(glyph.adv for glyph in glyphs)
+            + len(glyphs) * tstate.charspace
+            - adjust * 0.001
+        )
@@ -3,9 +3,11 @@ from typing import Any, List, Tuple
 
 import pytest
 
+import playa.parser
 from playa.parser import (
     KEYWORD_DICT_BEGIN,
     KEYWORD_DICT_END,
+    TOKEN_CACHE_SIZE,
     InlineImage,
     Lexer,
     ObjectParser,
@@ -374,6 +376,24 @@ def test_objects():
     ]
 
 
+BROKENDATA = b"""
+] /Hello
+<< /Foo 1 2 3 >>
+[ 1 2 >> 3 ]
+"""
+
+
+def test_broken_objects():
+    """Test recovery from unmatched end tokens and invalid keys."""
+    parser = ObjectParser(BROKENDATA)
+    objects = list(parser)
+    assert objects == [
+        (3, LIT("Hello")),
+        (10, {"Foo": 1}),
+        (27, [1, 2, 3]),
+    ]
+
+
 INLINEDATA1 = b"""
 BI
 /Foo (bar)
@@ -399,6 +419,50 @@ def test_inline_images():
     assert img.buffer == b"VARIOUS UTTER NONSENSE"
 
 
+def test_token_cache_size(monkeypatch):
+    """Verify that the token caches do not grow without limit."""
+    # Fill copies of the caches so as not to leave the real ones full
+    name_tokens = dict(playa.parser.NAME_TOKENS)
+    keyword_tokens = dict(playa.parser.KEYWORD_TOKENS)
+    monkeypatch.setattr(playa.parser, "NAME_TOKENS", name_tokens)
+    monkeypatch.setattr(playa.parser, "KEYWORD_TOKENS", keyword_tokens)
+    data = b" ".join(
+        b"/A#%02x%d k%d" % (i % 256, i, i) for i in range(TOKEN_CACHE_SIZE)
+    )
+    tokens = list(Lexer(data))
+    assert tokens[-2][1] is LIT("A%s%d" % (chr(255), TOKEN_CACHE_SIZE - 1))
+    assert tokens[-1][1] is KWD(b"k%d" % (TOKEN_CACHE_SIZE - 1))
+    assert len(name_tokens) == TOKEN_CACHE_SIZE
+    assert len(keyword_tokens) == TOKEN_CACHE_SIZE
+
+
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        # Terminated by newline + EI: only a CR before it is removed
+        (b"xy\nEI", b"xy"),
+        (b"xy\r\nEI", b"xy"),
+        (b"xy\r\n\nEI", b"xy\r\n"),
+        (b"\nEI", b""),
+        # Terminated by plain EI: the byte before it is removed, then
+        # any EOL before that
+        (b"xy EI", b"xy"),
+        (b"xy\rEI", b"xy"),
+        (b"xy\r\rEI", b"xy"),
+        (b"xy\n\rEI", b"xy"),
+        (b"xy\r\n EI", b"xy"),
+        (b"EI", b""),
+        (b" EI", b""),
+    ],
+)
+def test_inline_image_data(data: bytes, expected: bytes) -> None:
+    """Test the removal of the end of inline image data."""
+    parser = ObjectParser(b"BI /W 1 ID " + data)
+    (_, img) = next(parser)
+    assert isinstance(img, InlineImage)
+    assert img.rawdata == expected
+
+
 def test_reverse_solidus():
     """Test the handling of useless backslashes that are not escapes."""
     parser = Lexer(rb"(OMG\ WTF \W \T\ F)")